@@ -1,24 +1,41 @@
-from fastapi import FastAPI, APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.websockets import WebSocketState
+from mongojet import create_client, Client, Database, DuplicateKeyError
 import os
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import List, Optional, Dict, Any, Tuple, Set, Callable, Awaitable
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 import asyncio
-import json
+import base64
+import binascii
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import time
+import orjson
+from bson import ObjectId
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection - the Mongojet client is created on startup and shared
+# by every handler through app_state so they all reuse one connection pool
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+
+class AppState:
+    def __init__(self):
+        self.client: Optional[Client] = None
+        self.db: Optional[Database] = None
+
+app_state = AppState()
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -26,30 +43,213 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# WebSocket connection manager
+# WebSocket connection manager - broadcasts are queued and a single background
+# flusher sends each batch to every client concurrently as one JSON array
 class ConnectionManager:
+    MAX_BATCH = 64
+    SEND_TIMEOUT = 5.0  # seconds a client may take to accept a frame before it is dropped
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._flusher: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
+    def broadcast(self, message: Dict[str, Any]):
+        self.queue.put_nowait(message)
+
+    def start(self):
+        # Fresh queue so it is bound to the loop the flusher runs on
+        self.queue = asyncio.Queue()
+        self._flusher = asyncio.create_task(self._flush_forever())
+
+    async def stop(self):
+        if self._flusher:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+    async def _flush_forever(self):
+        while True:
+            messages = [await self.queue.get()]
+            while not self.queue.empty() and len(messages) < self.MAX_BATCH:
+                messages.append(self.queue.get_nowait())
             try:
-                await connection.send_text(message)
-            except:
-                pass
+                await self._send_all(orjson.dumps(messages, default=_orjson_default, option=orjson.OPT_UTC_Z))
+            except Exception:
+                # A bad batch must not kill the flusher and leave the queue growing undrained
+                logging.exception("Error broadcasting %d messages", len(messages))
+
+    async def _send_all(self, payload: bytes):
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(connection.send_bytes(payload), self.SEND_TIMEOUT) for connection in connections),
+            return_exceptions=True
+        )
+        # A failed or stalled send means the socket is unusable; prune them all in one pass
+        dropped = []
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                if not isinstance(result, WebSocketDisconnect):
+                    logging.warning("Dropping WebSocket after failed send: %r", result)
+                self.disconnect(connection)
+                dropped.append(connection)
+        # Close them too (a timed-out send may have left a partial frame), so the
+        # endpoint's receive loop ends and the client sees onclose and reconnects
+        await asyncio.gather(*(self._close(connection) for connection in dropped))
+
+    async def _close(self, connection: WebSocket):
+        try:
+            await asyncio.wait_for(connection.close(code=1011), self.SEND_TIMEOUT)
+        except Exception:
+            pass  # Already closed or unreachable; it is out of the broadcast set either way
 
 manager = ConnectionManager()
 
+# Booking writer - finished bookings are queued and stored in batches with a single
+# insert_many; booking_completed is broadcast for each record once it is written, or
+# booking_failed if it could not be stored
+class BookingWriter:
+    MAX_BATCH = 100
+    MAX_WAIT = 0.2  # seconds to keep filling a batch after its first record
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+
+    async def put(self, booking_record: Dict[str, Any]):
+        await self.queue.put(booking_record)
+
+    def start(self):
+        # Fresh queue so it is bound to the loop the writer runs on
+        self.queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_forever())
+
+    async def stop(self):
+        if self._writer:
+            # The sentinel makes the writer store whatever is still queued, then exit
+            self.queue.put_nowait(None)
+            await self._writer
+            self._writer = None
+
+    async def _write_forever(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+            while len(batch) < self.MAX_BATCH:
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    booking_record = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if booking_record is None:
+                    stopping = True
+                    break
+                batch.append(booking_record)
+                if deadline is None:
+                    deadline = loop.time() + self.MAX_WAIT
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            # Insert copies so the broadcast records stay free of MongoDB ObjectIds
+            await app_state.db.bookings.insert_many(
+                [booking_record.copy() for booking_record in batch], ordered=False
+            )
+            stored = [True] * len(batch)
+        except Exception as e:
+            # With ordered=False part of the batch may already be stored; retrying
+            # record by record lets the unique id index tell those from real failures
+            logging.error("Error storing %d bookings, retrying individually: %s", len(batch), e)
+            stored = await asyncio.gather(*(self._write_one(booking_record) for booking_record in batch))
+        for booking_record, ok in zip(batch, stored):
+            manager.broadcast({
+                "type": "booking_completed" if ok else "booking_failed",
+                "data": booking_record
+            })
+
+    async def _write_one(self, booking_record: Dict[str, Any]) -> bool:
+        try:
+            await app_state.db.bookings.insert_one(booking_record.copy())
+        except DuplicateKeyError:
+            pass  # Stored by the batch insert before it failed
+        except Exception as e:
+            logging.error("Error storing booking %s: %s", booking_record["id"], e)
+            return False
+        return True
+
+booking_writer = BookingWriter()
+
+# JSON helpers - serialize straight from Mongo documents with orjson,
+# bypassing FastAPI's jsonable_encoder and response_model re-validation.
+# OPT_UTC_Z writes UTC datetimes with a "Z" suffix, as pydantic does.
+def _orjson_default(obj: Any) -> Any:
+    # datetime is handled natively by orjson; only Mongo-specific types land here
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _json_response(content: Any) -> Response:
+    return Response(orjson.dumps(content, default=_orjson_default, option=orjson.OPT_UTC_Z), media_type="application/json")
+
+def _model_response(model: BaseModel) -> Response:
+    # pydantic-core encodes the model (datetimes included) without re-validation
+    return Response(model.model_dump_json(), media_type="application/json")
+
+# Cursor pagination - list endpoints page on (created_at, id), their sort key, with a
+# range predicate instead of skip(), which walks every preceding document; id breaks
+# ties between documents created in the same instant. The cursor is the last document's
+# created_at and id, base64url-encoded so it is URL-safe as is.
+_PAGE_SORT = {"created_at": -1, "id": -1}
+
+def _after_filter(after: Optional[str], as_string: bool = False) -> Dict[str, Any]:
+    if not after:
+        return {}
+    try:
+        created_at, last_id = orjson.loads(base64.urlsafe_b64decode(after + "=" * (-len(after) % 4)))
+        if not isinstance(created_at, str) or not isinstance(last_id, str):
+            raise ValueError(after)
+        # Bookings store created_at as a string (naive in older records, "+00:00" in newer
+        # ones), so their boundary is the stored value verbatim, compared as Mongo sorts it
+        boundary = created_at if as_string else datetime.fromisoformat(created_at)
+    except (TypeError, ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail=f"Invalid pagination cursor: {after}")
+    return {"$or": [
+        {"created_at": {"$lt": boundary}},
+        {"created_at": boundary, "id": {"$lt": last_id}}
+    ]}
+
+def _page(items: List[dict], limit: int) -> Dict[str, Any]:
+    next_cursor = None
+    if items and len(items) == limit:
+        last = items[-1]
+        created_at = last["created_at"]
+        if isinstance(created_at, datetime):
+            created_at = created_at.isoformat()
+        next_cursor = base64.urlsafe_b64encode(orjson.dumps([created_at, last["id"]])).decode().rstrip("=")
+    return {"items": items, "next": next_cursor}
+
+# Default factories for ids and timestamps
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 # Define Models
 
 # Applicant Models
@@ -67,14 +267,9 @@ class ApplicantCreate(ApplicantBase):
     pass
 
 class Applicant(ApplicantBase):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    id: str = Field(default_factory=_new_id)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
 
 # Login Credentials Models - Simplified for BLS Spain Algeria login
 class CredentialBase(BaseModel):
@@ -85,15 +280,10 @@ class CredentialCreate(CredentialBase):
     pass
 
 class Credential(CredentialBase):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    id: str = Field(default_factory=_new_id)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
     last_used: Optional[datetime] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 # BLS Automation Models - Enhanced with real BLS visa types and validation
 class VisaBookingRequest(BaseModel):
@@ -114,148 +304,240 @@ class CaptchaRequest(BaseModel):
     target_number: str
     captcha_images: List[str]  # Base64 encoded images
 
+# Request bodies for the BLS automation endpoints are parsed and validated straight
+# from the raw JSON bytes in a single pydantic-core call
+_BOOKING_REQUEST_ADAPTER = TypeAdapter(VisaBookingRequest)
+_CAPTCHA_REQUEST_ADAPTER = TypeAdapter(CaptchaRequest)
+
+def _validate_body(adapter: TypeAdapter, body: bytes) -> Any:
+    try:
+        return adapter.validate_json(body)
+    except ValidationError as e:
+        # Same 422 shape FastAPI produces for a declared body parameter
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+            body=body
+        )
+
+def _body_schema(model: type) -> Dict[str, Any]:
+    # Keeps the request body documented in OpenAPI for handlers that read it themselves
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": model.model_json_schema()}}}}
+
 class SystemStatus(BaseModel):
     is_running: bool = False
     current_task: Optional[str] = None
-    last_update: datetime = Field(default_factory=datetime.utcnow)
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    last_update: datetime = Field(default_factory=_utcnow)
+
+# Paginated list responses; declared for the OpenAPI schema only, since the
+# list endpoints return the Mongo documents as a pre-encoded Response
+class ApplicantPage(BaseModel):
+    items: List[Applicant]
+    next: Optional[str] = None
+
+class CredentialPage(BaseModel):
+    items: List[Credential]
+    next: Optional[str] = None
 
 # BLS System state
 system_status = SystemStatus()
 
+# Read projections - Mongo only returns (and the driver only decodes) the fields
+# each endpoint actually uses; "_id" is always excluded
+_APPLICANT_PROJECTION = {"_id": 0, **{field: 1 for field in Applicant.model_fields}}
+_CREDENTIAL_PROJECTION = {"_id": 0, **{field: 1 for field in Credential.model_fields}}
+# Booking list summary; booking_request duplicates booking_details
+_BOOKING_PROJECTION = {"_id": 0, "booking_request": 0}
+
+# In-process cache of the primary applicant and the active (first) credential, which
+# every booking reads. Each write to applicants/credentials invalidates its slot; the
+# TTL only bounds staleness from writes made by other worker processes.
+class PrimaryCache:
+    TTL = 30.0  # seconds
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._versions: Dict[str, int] = {}
+        # One lock per slot, so cold loads of different slots still overlap
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, slot: str, load: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(slot)
+        if entry and entry[0] > self._clock():
+            return entry[1]
+        async with self._locks.setdefault(slot, asyncio.Lock()):
+            entry = self._entries.get(slot)
+            if entry and entry[0] > self._clock():
+                return entry[1]
+            version = self._versions.get(slot, 0)
+            document = await load()
+            # Don't store a read that raced with an invalidation; misses aren't cached
+            if document is not None and self._versions.get(slot, 0) == version:
+                self._entries[slot] = (self._clock() + self.TTL, document)
+            return document
+
+    def invalidate(self, slot: str):
+        self._versions[slot] = self._versions.get(slot, 0) + 1
+        self._entries.pop(slot, None)
+
+primary_cache = PrimaryCache()
+
+async def _get_primary_applicant() -> Optional[Dict[str, Any]]:
+    return await primary_cache.get(
+        "applicant",
+        lambda: app_state.db.applicants.find_one({"is_primary": True}, projection=_APPLICANT_PROJECTION)
+    )
+
+async def _get_active_credential() -> Optional[Dict[str, Any]]:
+    return await primary_cache.get(
+        "credential",
+        lambda: app_state.db.credentials.find_one(projection=_CREDENTIAL_PROJECTION)
+    )
+
 # ==================== APPLICANT MANAGEMENT APIs ====================
 
 @api_router.post("/applicants", response_model=Applicant)
 async def create_applicant(applicant_data: ApplicantCreate):
     """Create a new applicant with primary designation logic"""
     try:
-        # If this applicant is marked as primary, unset any existing primary
-        if applicant_data.is_primary:
-            await db.applicants.update_many(
-                {"is_primary": True}, 
-                {"$set": {"is_primary": False, "updated_at": datetime.utcnow()}}
-            )
-        
-        applicant_dict = applicant_data.dict()
+        applicant_dict = applicant_data.model_dump()
         applicant = Applicant(**applicant_dict)
         
         # Insert into database
-        result = await db.applicants.insert_one(applicant.dict())
+        writes = [app_state.db.applicants.insert_one(applicant.model_dump())]
+        
+        # If this applicant is marked as primary, unset any existing primary;
+        # the filter excludes the new document so both writes can run concurrently
+        if applicant_data.is_primary:
+            writes.append(app_state.db.applicants.update_many(
+                {"is_primary": True, "id": {"$ne": applicant.id}}, 
+                {"$set": {"is_primary": False, "updated_at": _utcnow()}}
+            ))
+        
+        try:
+            await asyncio.gather(*writes)
+        finally:
+            # Either write may have landed even if the other failed
+            primary_cache.invalidate("applicant")
         
         # Broadcast update via WebSocket
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "applicant_created",
-            "data": json.loads(applicant.json())
-        }))
+            "data": applicant.model_dump()
+        })
         
-        return applicant
+        return _model_response(applicant)
     except Exception as e:
-        logging.error(f"Error creating applicant: {str(e)}")
+        logging.error("Error creating applicant: %s", e)
         raise HTTPException(status_code=500, detail=f"Error creating applicant: {str(e)}")
 
-@api_router.get("/applicants", response_model=List[Applicant])
-async def get_applicants(skip: int = 0, limit: int = 100):
+@api_router.get("/applicants", response_model=ApplicantPage)
+async def get_applicants(after: Optional[str] = None, limit: int = 100):
     """Get all applicants with pagination"""
     try:
-        cursor = db.applicants.find().skip(skip).limit(limit).sort("created_at", -1)
-        applicants = await cursor.to_list(length=limit)
-        return [Applicant(**applicant) for applicant in applicants]
+        applicants = await app_state.db.applicants.find_many(
+            _after_filter(after), sort=_PAGE_SORT, limit=limit,
+            projection=_APPLICANT_PROJECTION
+        )
+        return _json_response(_page(applicants, limit))
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Error fetching applicants: {str(e)}")
+        logging.error("Error fetching applicants: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching applicants: {str(e)}")
 
 @api_router.get("/applicants/{applicant_id}", response_model=Applicant)
 async def get_applicant(applicant_id: str):
     """Get specific applicant by ID"""
     try:
-        applicant = await db.applicants.find_one({"id": applicant_id})
+        applicant = await app_state.db.applicants.find_one({"id": applicant_id}, projection=_APPLICANT_PROJECTION)
         if not applicant:
             raise HTTPException(status_code=404, detail="Applicant not found")
-        return Applicant(**applicant)
+        return _json_response(applicant)
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error fetching applicant: {str(e)}")
+        logging.error("Error fetching applicant: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching applicant: {str(e)}")
 
 @api_router.put("/applicants/{applicant_id}", response_model=Applicant)
 async def update_applicant(applicant_id: str, applicant_data: ApplicantCreate):
     """Update applicant information"""
     try:
-        # Check if applicant exists
-        existing = await db.applicants.find_one({"id": applicant_id})
-        if not existing:
-            raise HTTPException(status_code=404, detail="Applicant not found")
-        
-        # If this applicant is being set as primary, unset any existing primary
-        if applicant_data.is_primary:
-            await db.applicants.update_many(
-                {"is_primary": True, "id": {"$ne": applicant_id}}, 
-                {"$set": {"is_primary": False, "updated_at": datetime.utcnow()}}
-            )
+        update_data = applicant_data.model_dump()
+        update_data["updated_at"] = _utcnow()
         
-        update_data = applicant_data.dict()
-        update_data["updated_at"] = datetime.utcnow()
-        
-        await db.applicants.update_one(
+        # Update and fetch the applicant in a single round trip; None means it doesn't exist
+        updated_applicant = await app_state.db.applicants.find_one_and_update(
             {"id": applicant_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document="after",
+            projection=_APPLICANT_PROJECTION
         )
+        if not updated_applicant:
+            raise HTTPException(status_code=404, detail="Applicant not found")
         
-        # Fetch updated applicant
-        updated_applicant = await db.applicants.find_one({"id": applicant_id})
-        applicant = Applicant(**updated_applicant)
+        try:
+            # If this applicant is being set as primary, unset any existing primary
+            # (only once the update matched, so a 404 never demotes the current primary)
+            if applicant_data.is_primary:
+                await app_state.db.applicants.update_many(
+                    {"is_primary": True, "id": {"$ne": applicant_id}}, 
+                    {"$set": {"is_primary": False, "updated_at": _utcnow()}}
+                )
+        finally:
+            # The applicant itself was already updated, even if the demotion failed
+            primary_cache.invalidate("applicant")
+        
+        applicant = Applicant.model_construct(**updated_applicant)
         
         # Broadcast update via WebSocket
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "applicant_updated",
-            "data": json.loads(applicant.json())
-        }))
+            "data": applicant.model_dump()
+        })
         
-        return applicant
+        return _model_response(applicant)
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error updating applicant: {str(e)}")
+        logging.error("Error updating applicant: %s", e)
         raise HTTPException(status_code=500, detail=f"Error updating applicant: {str(e)}")
 
 @api_router.delete("/applicants/{applicant_id}")
 async def delete_applicant(applicant_id: str):
     """Delete applicant with verification"""
     try:
-        result = await db.applicants.delete_one({"id": applicant_id})
-        if result.deleted_count == 0:
+        result = await app_state.db.applicants.delete_one({"id": applicant_id})
+        primary_cache.invalidate("applicant")
+        if result["deleted_count"] == 0:
             raise HTTPException(status_code=404, detail="Applicant not found")
         
         # Broadcast update via WebSocket
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "applicant_deleted",
             "data": {"id": applicant_id}
-        }))
+        })
         
         return {"message": "Applicant deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error deleting applicant: {str(e)}")
+        logging.error("Error deleting applicant: %s", e)
         raise HTTPException(status_code=500, detail=f"Error deleting applicant: {str(e)}")
 
-@api_router.get("/applicants/primary/info")
+@api_router.get("/applicants/primary/info", response_model=Applicant)
 async def get_primary_applicant():
     """Get primary applicant for booking"""
     try:
-        primary_applicant = await db.applicants.find_one({"is_primary": True})
+        primary_applicant = await _get_primary_applicant()
         if not primary_applicant:
             raise HTTPException(status_code=404, detail="No primary applicant found")
-        return Applicant(**primary_applicant)
+        return _json_response(primary_applicant)
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error fetching primary applicant: {str(e)}")
+        logging.error("Error fetching primary applicant: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching primary applicant: {str(e)}")
 
 # ==================== LOGIN CREDENTIALS MANAGEMENT APIs ====================
@@ -264,120 +546,190 @@ async def get_primary_applicant():
 async def create_credential(credential_data: CredentialCreate):
     """Create new login credentials for BLS Spain Algeria"""
     try:
-        credential_dict = credential_data.dict()
+        credential_dict = credential_data.model_dump()
         credential = Credential(**credential_dict)
         
         # Insert into database
-        result = await db.credentials.insert_one(credential.dict())
+        result = await app_state.db.credentials.insert_one(credential.model_dump())
+        primary_cache.invalidate("credential")
         
         # Broadcast update via WebSocket
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "credential_created",
-            "data": json.loads(credential.json())
-        }))
+            "data": credential.model_dump()
+        })
         
-        return credential
+        return _model_response(credential)
     except Exception as e:
-        logging.error(f"Error creating credential: {str(e)}")
+        logging.error("Error creating credential: %s", e)
         raise HTTPException(status_code=500, detail=f"Error creating credential: {str(e)}")
 
-@api_router.get("/credentials", response_model=List[Credential])
-async def get_credentials(skip: int = 0, limit: int = 100):
+@api_router.get("/credentials", response_model=CredentialPage)
+async def get_credentials(after: Optional[str] = None, limit: int = 100):
     """Get all credentials"""
     try:
-        cursor = db.credentials.find().skip(skip).limit(limit).sort("created_at", -1)
-        credentials = await cursor.to_list(length=limit)
-        return [Credential(**credential) for credential in credentials]
+        credentials = await app_state.db.credentials.find_many(
+            _after_filter(after), sort=_PAGE_SORT, limit=limit,
+            projection=_CREDENTIAL_PROJECTION
+        )
+        return _json_response(_page(credentials, limit))
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Error fetching credentials: {str(e)}")
+        logging.error("Error fetching credentials: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching credentials: {str(e)}")
 
 @api_router.get("/credentials/{credential_id}", response_model=Credential)
 async def get_credential(credential_id: str):
     """Get specific credential by ID"""
     try:
-        credential = await db.credentials.find_one({"id": credential_id})
+        credential = await app_state.db.credentials.find_one({"id": credential_id}, projection=_CREDENTIAL_PROJECTION)
         if not credential:
             raise HTTPException(status_code=404, detail="Credential not found")
-        return Credential(**credential)
+        return _json_response(credential)
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error fetching credential: {str(e)}")
+        logging.error("Error fetching credential: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching credential: {str(e)}")
 
 @api_router.put("/credentials/{credential_id}", response_model=Credential)
 async def update_credential(credential_id: str, credential_data: CredentialCreate):
     """Update credential information"""
     try:
-        # Check if credential exists
-        existing = await db.credentials.find_one({"id": credential_id})
-        if not existing:
-            raise HTTPException(status_code=404, detail="Credential not found")
+        update_data = credential_data.model_dump()
+        update_data["updated_at"] = _utcnow()
         
-        update_data = credential_data.dict()
-        update_data["updated_at"] = datetime.utcnow()
-        
-        await db.credentials.update_one(
+        # Update and fetch the credential in a single round trip; None means it doesn't exist
+        updated_credential = await app_state.db.credentials.find_one_and_update(
             {"id": credential_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document="after",
+            projection=_CREDENTIAL_PROJECTION
         )
+        primary_cache.invalidate("credential")
+        if not updated_credential:
+            raise HTTPException(status_code=404, detail="Credential not found")
         
-        # Fetch updated credential
-        updated_credential = await db.credentials.find_one({"id": credential_id})
-        credential = Credential(**updated_credential)
+        credential = Credential.model_construct(**updated_credential)
         
         # Broadcast update via WebSocket
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "credential_updated",
-            "data": json.loads(credential.json())
-        }))
+            "data": credential.model_dump()
+        })
         
-        return credential
+        return _model_response(credential)
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error updating credential: {str(e)}")
+        logging.error("Error updating credential: %s", e)
         raise HTTPException(status_code=500, detail=f"Error updating credential: {str(e)}")
 
 @api_router.delete("/credentials/{credential_id}")
 async def delete_credential(credential_id: str):
     """Delete credential with verification"""
     try:
-        result = await db.credentials.delete_one({"id": credential_id})
-        if result.deleted_count == 0:
+        result = await app_state.db.credentials.delete_one({"id": credential_id})
+        primary_cache.invalidate("credential")
+        if result["deleted_count"] == 0:
             raise HTTPException(status_code=404, detail="Credential not found")
         
         # Broadcast update via WebSocket
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "credential_deleted",
             "data": {"id": credential_id}
-        }))
+        })
         
         return {"message": "Credential deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error deleting credential: {str(e)}")
+        logging.error("Error deleting credential: %s", e)
         raise HTTPException(status_code=500, detail=f"Error deleting credential: {str(e)}")
 
-@api_router.get("/credentials/active/info")
+@api_router.get("/credentials/active/info", response_model=Credential)
 async def get_active_credential():
     """Get first available credential for automation"""
     try:
-        credential = await db.credentials.find_one()
+        credential = await _get_active_credential()
         if not credential:
             raise HTTPException(status_code=404, detail="No credential found")
-        return Credential(**credential)
+        return _json_response(credential)
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error fetching credential: {str(e)}")
+        logging.error("Error fetching credential: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching credential: {str(e)}")
 
 # ==================== BLS AUTOMATION CORE SYSTEM ====================
 
-# ==================== BLS AUTOMATION CORE SYSTEM ====================
+# Static BLS reference data, built once at import time
+
+# Valid categories for each Schengen visa history
+_VALID_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "never": ("ORAN 1", "ALG 1"),
+    "before_2020": ("ORAN 1", "ALG 1"),
+    "after_2020_6months": ("ORAN 2", "ALG 2"),
+    "after_2020_6months_2years": ("ORAN 3", "ALG 3"),
+    "after_2020_2years_plus": ("ORAN 4", "ALG 4")
+}
+
+# Location-specific suggestions keyed by (location prefix, history), e.g. ("ORA", "never")
+_CATS_BY_LOC_HISTORY: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    (prefix, history): tuple(cat for cat in categories if cat.startswith(prefix))
+    for history, categories in _VALID_CATEGORIES.items()
+    for prefix in ("ORA", "ALG")
+}
+
+# Visa types and categories served by /bls/visa-info
+_VISA_INFO: Dict[str, Any] = {
+    "visa_types": [
+        "National Visa",
+        "Schengen Visa",
+        "Schengen visa (Estonia)",
+        "First application / première demande",
+        "Visa renewal / renouvellement de visa"
+    ],
+    "visa_sub_types": [
+        "Tourism",
+        "Family reunification visa",
+        "Study visa",
+        "Schengen Visa"
+    ],
+    "locations": [
+        "Oran",
+        "Algiers"
+    ],
+    "categories_by_location": {
+        "Oran": ["ORAN 1", "ORAN 2", "ORAN 3", "ORAN 4"],
+        "Algiers": ["ALG 1", "ALG 2", "ALG 3", "ALG 4"]
+    },
+    "category_requirements": {
+        "ORAN 1": "Never obtained a Schengen visa or issued before 2020",
+        "ORAN 2": "Schengen visa after Jan 1, 2020, valid ≤ 6 months",
+        "ORAN 3": "Schengen visa after Jan 1, 2020, valid > 6 months, < 2 years",
+        "ORAN 4": "Schengen visa after Jan 1, 2020, valid ≥ 2 years",
+        "ALG 1": "Never obtained a Schengen visa or issued before 2020",
+        "ALG 2": "Schengen visa after Jan 1, 2020, valid ≤ 6 months",
+        "ALG 3": "Schengen visa after Jan 1, 2020, valid > 6 months, < 2 years",
+        "ALG 4": "Schengen visa after Jan 1, 2020, valid ≥ 2 years",
+        "FAMILY GROUP": "Exclusively for children < 12 whose parents hold visa valid > 180 days"
+    },
+    "schengen_history_options": [
+        {"value": "never", "label": "Never had a Schengen visa"},
+        {"value": "before_2020", "label": "Had Schengen visa before 2020"},
+        {"value": "after_2020_6months", "label": "Schengen visa after 2020, valid ≤ 6 months"},
+        {"value": "after_2020_6months_2years", "label": "Schengen visa after 2020, valid > 6 months, < 2 years"},
+        {"value": "after_2020_2years_plus", "label": "Schengen visa after 2020, valid ≥ 2 years"}
+    ]
+}
+
+# Served as-is on every request, so encode it once
+_VISA_INFO_BYTES = orjson.dumps(_VISA_INFO)
+
+def _suggested_categories(location: str, schengen_history: str) -> Tuple[str, ...]:
+    return _CATS_BY_LOC_HISTORY.get((location.upper()[:3], schengen_history), ())
 
 # BLS Visa Category Validation Helper
 @api_router.post("/bls/validate-category")
@@ -388,114 +740,92 @@ async def validate_visa_category(request: dict):
         category = request.get("category")
         schengen_history = request.get("schengen_visa_history")
         
-        # Define valid category mappings based on Schengen visa history
-        valid_categories = {
-            "never": ["ORAN 1", "ALG 1"],
-            "before_2020": ["ORAN 1", "ALG 1"],
-            "after_2020_6months": ["ORAN 2", "ALG 2"],
-            "after_2020_6months_2years": ["ORAN 3", "ALG 3"],
-            "after_2020_2years_plus": ["ORAN 4", "ALG 4"]
-        }
-        
         # Check if category matches history
-        is_valid = category in valid_categories.get(schengen_history, [])
+        recommended = _VALID_CATEGORIES.get(schengen_history, ())
+        is_valid = category in recommended
         
         # Generate appropriate message
         if is_valid:
             message = f"Category '{category}' is valid for your Schengen visa history."
         else:
-            suggested_categories = valid_categories.get(schengen_history, [])
-            location_specific = [cat for cat in suggested_categories if cat.startswith(location.upper()[:3])]
+            location_specific = _suggested_categories(location, schengen_history)
             message = f"Category '{category}' does not match your visa history. Recommended: {', '.join(location_specific)}"
         
         return {
             "is_valid": is_valid,
             "message": message,
-            "recommended_categories": valid_categories.get(schengen_history, [])
+            "recommended_categories": list(recommended)
         }
     except Exception as e:
-        logging.error(f"Error validating category: {str(e)}")
+        logging.error("Error validating category: %s", e)
         raise HTTPException(status_code=500, detail=f"Error validating category: {str(e)}")
 
 # BLS Visa Types and Categories Info
 @api_router.get("/bls/visa-info")
 async def get_visa_info():
     """Get comprehensive visa types and categories information"""
+    # Content only changes on deploy, so let clients and proxies cache it
+    return Response(
+        _VISA_INFO_BYTES,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
+
+async def _finalize_booking(booking_record: Dict[str, Any]):
+    """Run the BLS automation steps for a queued booking, then hand it to the booking writer"""
     try:
-        visa_info = {
-            "visa_types": [
-                "National Visa",
-                "Schengen Visa",
-                "Schengen visa (Estonia)",
-                "First application / première demande",
-                "Visa renewal / renouvellement de visa"
-            ],
-            "visa_sub_types": [
-                "Tourism",
-                "Family reunification visa",
-                "Study visa",
-                "Schengen Visa"
-            ],
-            "locations": [
-                "Oran",
-                "Algiers"
-            ],
-            "categories_by_location": {
-                "Oran": ["ORAN 1", "ORAN 2", "ORAN 3", "ORAN 4"],
-                "Algiers": ["ALG 1", "ALG 2", "ALG 3", "ALG 4"]
-            },
-            "category_requirements": {
-                "ORAN 1": "Never obtained a Schengen visa or issued before 2020",
-                "ORAN 2": "Schengen visa after Jan 1, 2020, valid ≤ 6 months",
-                "ORAN 3": "Schengen visa after Jan 1, 2020, valid > 6 months, < 2 years",
-                "ORAN 4": "Schengen visa after Jan 1, 2020, valid ≥ 2 years",
-                "ALG 1": "Never obtained a Schengen visa or issued before 2020",
-                "ALG 2": "Schengen visa after Jan 1, 2020, valid ≤ 6 months",
-                "ALG 3": "Schengen visa after Jan 1, 2020, valid > 6 months, < 2 years",
-                "ALG 4": "Schengen visa after Jan 1, 2020, valid ≥ 2 years",
-                "FAMILY GROUP": "Exclusively for children < 12 whose parents hold visa valid > 180 days"
-            },
-            "schengen_history_options": [
-                {"value": "never", "label": "Never had a Schengen visa"},
-                {"value": "before_2020", "label": "Had Schengen visa before 2020"},
-                {"value": "after_2020_6months", "label": "Schengen visa after 2020, valid ≤ 6 months"},
-                {"value": "after_2020_6months_2years", "label": "Schengen visa after 2020, valid > 6 months, < 2 years"},
-                {"value": "after_2020_2years_plus", "label": "Schengen visa after 2020, valid ≥ 2 years"}
-            ]
-        }
+        # In a real implementation, this would use Selenium/Playwright to automate BLS booking
+        # The captcha solving would happen automatically in the background during this process
+        await asyncio.sleep(2)  # Simulate processing time
+        
+        # Update status to show captcha solving automatically
+        system_status.current_task = f"Solving captcha automatically in background..."
+        manager.broadcast({
+            "type": "system_status", 
+            "data": system_status.model_dump()
+        })
+        
+        await asyncio.sleep(1)  # Simulate captcha solving time
+        
+        # Update status to show booking completion
+        system_status.current_task = f"Completing booking process..."
+        manager.broadcast({
+            "type": "system_status",
+            "data": system_status.model_dump()
+        })
+        
+        await asyncio.sleep(1)  # Simulate final booking steps
         
-        return visa_info
+        # Stored in the next insert_many batch, which also broadcasts booking_completed
+        await booking_writer.put(booking_record)
     except Exception as e:
-        logging.error(f"Error fetching visa info: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error fetching visa info: {str(e)}")
+        logging.error("Error completing booking %s: %s", booking_record["id"], e)
+    finally:
+        # Update system status
+        system_status.is_running = False
+        system_status.current_task = None
+        system_status.last_update = _utcnow()
 
-@api_router.post("/bls/book-appointment")
-async def book_appointment(booking_request: VisaBookingRequest):
-    """Book visa appointment using BLS automation with enhanced validation"""
+@api_router.post("/bls/book-appointment", openapi_extra=_body_schema(VisaBookingRequest))
+async def book_appointment(request: Request, background_tasks: BackgroundTasks):
+    """Validate and queue a visa appointment booking; the BLS automation runs in the background"""
+    booking_request = _validate_body(_BOOKING_REQUEST_ADAPTER, await request.body())
     try:
-        # Get first available credential
-        credential = await db.credentials.find_one()
+        # Get first available credential and primary applicant concurrently
+        credential, primary_applicant = await asyncio.gather(
+            _get_active_credential(),
+            _get_primary_applicant()
+        )
         if not credential:
             raise HTTPException(status_code=400, detail="No credential found for automation. Please add BLS login credentials first.")
         
-        # Get primary applicant
-        primary_applicant = await db.applicants.find_one({"is_primary": True})
         if not primary_applicant:
             raise HTTPException(status_code=400, detail="No primary applicant found for booking")
         
         # Validate category selection if Schengen history is provided
         if hasattr(booking_request, 'schengen_visa_history') and booking_request.schengen_visa_history:
-            valid_categories = {
-                "never": ["ORAN 1", "ALG 1"],
-                "before_2020": ["ORAN 1", "ALG 1"],
-                "after_2020_6months": ["ORAN 2", "ALG 2"],
-                "after_2020_6months_2years": ["ORAN 3", "ALG 3"],
-                "after_2020_2years_plus": ["ORAN 4", "ALG 4"]
-            }
-            
-            if booking_request.category not in valid_categories.get(booking_request.schengen_visa_history, []):
-                suggested_categories = valid_categories.get(booking_request.schengen_visa_history, [])
-                location_specific = [cat for cat in suggested_categories if cat.startswith(booking_request.location.upper()[:3])]
+            if booking_request.category not in _VALID_CATEGORIES.get(booking_request.schengen_visa_history, ()):
+                location_specific = _suggested_categories(booking_request.location, booking_request.schengen_visa_history)
                 raise HTTPException(
                     status_code=400, 
                     detail=f"Category '{booking_request.category}' does not match your Schengen visa history. Use: {', '.join(location_specific)}"
@@ -504,45 +834,23 @@ async def book_appointment(booking_request: VisaBookingRequest):
         # Update system status
         system_status.is_running = True
         system_status.current_task = f"Starting BLS automation: {booking_request.visa_type} appointment for {booking_request.location}"
-        system_status.last_update = datetime.utcnow()
+        system_status.last_update = _utcnow()
         
         # Broadcast status update
-        await manager.broadcast(json.dumps({
-            "type": "system_status",
-            "data": json.loads(system_status.json())
-        }))
-        
-        # In a real implementation, this would use Selenium/Playwright to automate BLS booking
-        # The captcha solving would happen automatically in the background during this process
-        await asyncio.sleep(2)  # Simulate processing time
-        
-        # Update status to show captcha solving automatically
-        system_status.current_task = f"Solving captcha automatically in background..."
-        await manager.broadcast(json.dumps({
-            "type": "system_status", 
-            "data": json.loads(system_status.json())
-        }))
-        
-        await asyncio.sleep(1)  # Simulate captcha solving time
-        
-        # Update status to show booking completion
-        system_status.current_task = f"Completing booking process..."
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "system_status",
-            "data": json.loads(system_status.json()) 
-        }))
-        
-        await asyncio.sleep(1)  # Simulate final booking steps
+            "data": system_status.model_dump()
+        })
         
         # Create enhanced booking record
         booking_record = {
-            "id": str(uuid.uuid4()),
+            "id": _new_id(),
             "applicant_id": primary_applicant["id"],
             "credential_id": credential["id"],
-            "booking_request": booking_request.dict(),
+            "booking_request": booking_request.model_dump(),
             "status": "completed",
             "validation_passed": True,
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": _utcnow().isoformat(),
             "booking_details": {
                 "location": booking_request.location,
                 "visa_type": booking_request.visa_type,
@@ -555,70 +863,89 @@ async def book_appointment(booking_request: VisaBookingRequest):
             }
         }
         
-        # Insert into database
-        result = await db.bookings.insert_one(booking_record.copy())
-        
-        # Update system status
-        system_status.is_running = False
-        system_status.current_task = None
-        system_status.last_update = datetime.utcnow()
-        
-        # Broadcast completion (use the original record without MongoDB ObjectId)
-        await manager.broadcast(json.dumps({
-            "type": "booking_completed",
-            "data": booking_record
-        }))
+        # Respond now; completion is pushed over the WebSocket as booking_completed
+        background_tasks.add_task(_finalize_booking, booking_record)
         
         return {
-            "status": "success",
-            "message": "Appointment booking completed successfully! Captcha was solved automatically in the background.",
+            "status": "queued",
+            "message": "Appointment booking started! Captcha will be solved automatically in the background.",
             "booking_id": booking_record["id"],
             "booking_details": booking_record["booking_details"]
         }
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error booking appointment: {str(e)}")
+        logging.error("Error booking appointment: %s", e)
         raise HTTPException(status_code=500, detail=f"Error booking appointment: {str(e)}")
 
-@api_router.post("/bls/solve-captcha")
-async def solve_captcha(captcha_request: CaptchaRequest):
+# Captcha decoding/OCR is CPU-bound, so it runs in a process pool (created on startup)
+# instead of on the event loop, where it would stall every other request
+_captcha_executor: Optional[ProcessPoolExecutor] = None
+
+def _decode_captcha_image(image: str) -> Optional[bytes]:
+    """Decode a base64 captcha image, plain, line-wrapped or as a data: URL"""
+    if image.startswith("data:"):
+        image = image.partition(",")[2]
+    try:
+        # Non-validating decode skips line breaks and other non-alphabet characters
+        return base64.b64decode(image)
+    except binascii.Error:
+        return None  # An undecodable image simply can't match the target
+
+def _find_target_images(images: List[Optional[bytes]], target_number: str) -> List[int]:
+    """Return the indices of the decoded images containing target_number"""
+    # In a real implementation, this would use OCR to analyze the captcha images
+    # and return the indices of images containing the target number
+    return [0, 5, 12, 18]  # Mock indices
+
+def _solve_captcha_cpu(target_number: str, captcha_images: List[str]) -> List[int]:
+    """Decode the captcha images and return the indices of those showing target_number"""
+    return _find_target_images([_decode_captcha_image(image) for image in captcha_images], target_number)
+
+async def _store_captcha_solution(captcha_record: Dict[str, Any]):
+    """Persist a captcha solution record after the response has been sent"""
+    try:
+        await app_state.db.captcha_solutions.insert_one(captcha_record)
+    except Exception as e:
+        logging.error("Error storing captcha solution: %s", e)
+
+@api_router.post("/bls/solve-captcha", openapi_extra=_body_schema(CaptchaRequest))
+async def solve_captcha(request: Request, background_tasks: BackgroundTasks):
     """Solve BLS captcha using OCR"""
+    captcha_request = _validate_body(_CAPTCHA_REQUEST_ADAPTER, await request.body())
     try:
-        # In a real implementation, this would use OCR to analyze the captcha images
-        # and return the indices of images containing the target number
-        
-        # For now, simulate captcha solving
-        await asyncio.sleep(1)  # Simulate processing time
+        selected_indices = await asyncio.get_running_loop().run_in_executor(
+            _captcha_executor, _solve_captcha_cpu,
+            captcha_request.target_number, captcha_request.captcha_images
+        )
         
-        # Return mock solution (indices of correct images)
         solution = {
             "target_number": captcha_request.target_number,
-            "selected_indices": [0, 5, 12, 18],  # Mock indices
+            "selected_indices": selected_indices,
             "confidence": 0.95,
-            "solved_at": datetime.utcnow().isoformat()
+            "solved_at": _utcnow().isoformat()
         }
         
-        # Store captcha solution record
+        # Store captcha solution record (never the raw images)
         captcha_record = {
-            "id": str(uuid.uuid4()),
+            "id": _new_id(),
             "target_number": captcha_request.target_number,
             "num_images": len(captcha_request.captcha_images),
             "solution": solution,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": _utcnow().isoformat()
         }
         
-        await db.captcha_solutions.insert_one(captcha_record)
+        background_tasks.add_task(_store_captcha_solution, captcha_record)
         
         return solution
     except Exception as e:
-        logging.error(f"Error solving captcha: {str(e)}")
+        logging.error("Error solving captcha: %s", e)
         raise HTTPException(status_code=500, detail=f"Error solving captcha: {str(e)}")
 
-@api_router.get("/bls/status")
+@api_router.get("/bls/status", response_model=SystemStatus)
 async def get_system_status():
     """Get current BLS automation system status"""
-    return system_status
+    return _model_response(system_status)
 
 @api_router.post("/bls/start")
 async def start_system():
@@ -626,16 +953,16 @@ async def start_system():
     try:
         system_status.is_running = True
         system_status.current_task = "System initialized"
-        system_status.last_update = datetime.utcnow()
+        system_status.last_update = _utcnow()
         
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "system_started",
-            "data": json.loads(system_status.json())
-        }))
+            "data": system_status.model_dump()
+        })
         
-        return {"message": "BLS automation system started", "status": json.loads(system_status.json())}
+        return {"message": "BLS automation system started", "status": system_status.model_dump()}
     except Exception as e:
-        logging.error(f"Error starting system: {str(e)}")
+        logging.error("Error starting system: %s", e)
         raise HTTPException(status_code=500, detail=f"Error starting system: {str(e)}")
 
 @api_router.post("/bls/stop")
@@ -644,33 +971,32 @@ async def stop_system():
     try:
         system_status.is_running = False
         system_status.current_task = None
-        system_status.last_update = datetime.utcnow()
+        system_status.last_update = _utcnow()
         
-        await manager.broadcast(json.dumps({
+        manager.broadcast({
             "type": "system_stopped",
-            "data": json.loads(system_status.json())
-        }))
+            "data": system_status.model_dump()
+        })
         
-        return {"message": "BLS automation system stopped", "status": json.loads(system_status.json())}
+        return {"message": "BLS automation system stopped", "status": system_status.model_dump()}
     except Exception as e:
-        logging.error(f"Error stopping system: {str(e)}")
+        logging.error("Error stopping system: %s", e)
         raise HTTPException(status_code=500, detail=f"Error stopping system: {str(e)}")
 
 @api_router.get("/bls/bookings")
-async def get_bookings(skip: int = 0, limit: int = 100):
+async def get_bookings(after: Optional[str] = None, limit: int = 100):
     """Get booking history"""
     try:
-        cursor = db.bookings.find().skip(skip).limit(limit).sort("created_at", -1)
-        bookings = await cursor.to_list(length=limit)
-        
-        # Convert MongoDB documents to JSON-serializable format
-        for booking in bookings:
-            if "_id" in booking:
-                del booking["_id"]  # Remove MongoDB ObjectId
-                
-        return bookings
+        bookings = await app_state.db.bookings.find_many(
+            _after_filter(after, as_string=True), sort=_PAGE_SORT, limit=limit,
+            projection=_BOOKING_PROJECTION
+        )
+        
+        return _json_response(_page(bookings, limit))
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Error fetching bookings: {str(e)}")
+        logging.error("Error fetching bookings: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching bookings: {str(e)}")
 
 # ==================== WEBSOCKET ENDPOINT ====================
@@ -685,32 +1011,43 @@ async def websocket_endpoint(websocket: WebSocket):
             await manager.send_personal_message(f"Echo: {data}", websocket)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
+    except RuntimeError:
+        # The broadcaster closed this socket after a failed send
+        if websocket.application_state == WebSocketState.CONNECTED:
+            raise
+        manager.disconnect(websocket)
 
 # ==================== ORIGINAL STATUS CHECK APIs ====================
 
 class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=_new_id)
     client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+# Validates and serializes a whole list of status checks in one pydantic-core pass
+_STATUS_CHECK_LIST_ADAPTER = TypeAdapter(List[StatusCheck])
+
 @api_router.get("/")
 async def root():
     return {"message": "BLS-SPANISH Automation System API"}
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
+    status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+    _ = await app_state.db.status_checks.insert_one(status_obj.model_dump())
+    return _model_response(status_obj)
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    status_checks = await app_state.db.status_checks.find_many({}, limit=1000)
+    return Response(
+        _STATUS_CHECK_LIST_ADAPTER.dump_json(_STATUS_CHECK_LIST_ADAPTER.validate_python(status_checks)),
+        media_type="application/json"
+    )
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -730,6 +1067,76 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Log records are put on a queue by the event loop and written out by a listener
+# thread, so a slow stderr never blocks request handling
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener: Optional[QueueListener] = None
+
+@app.on_event("startup")
+async def start_log_listener():
+    global _log_listener
+    root_logger = logging.getLogger()
+    _log_listener = QueueListener(_log_queue, *root_logger.handlers, respect_handler_level=True)
+    root_logger.handlers = [QueueHandler(_log_queue)]
+    _log_listener.start()
+
+@app.on_event("shutdown")
+async def stop_log_listener():
+    global _log_listener
+    # Flushes anything still queued, then hands the handlers back to the root logger
+    _log_listener.stop()
+    logging.getLogger().handlers = list(_log_listener.handlers)
+    _log_listener = None
+
+async def ensure_indexes():
+    """Create the indexes backing id lookups, primary lookups and pagination"""
+    await asyncio.gather(
+        app_state.db.applicants.create_index("id", unique=True),
+        app_state.db.applicants.create_index("is_primary"),
+        app_state.db.credentials.create_index("id", unique=True),
+        app_state.db.bookings.create_index("id", unique=True),
+        *(
+            app_state.db[collection].create_index([("created_at", -1), ("id", -1)])
+            for collection in ("applicants", "credentials", "bookings")
+        )
+    )
+
+@app.on_event("startup")
+async def startup_db_client():
+    app_state.client = await create_client(mongo_url)
+    app_state.db = app_state.client.get_database(os.environ['DB_NAME'])
+    await ensure_indexes()
+
+@app.on_event("startup")
+async def start_broadcast_flusher():
+    manager.start()
+
+@app.on_event("startup")
+async def start_booking_writer():
+    booking_writer.start()
+
+@app.on_event("startup")
+async def start_captcha_executor():
+    global _captcha_executor
+    # spawn rather than fork: the parent already runs driver and logging threads
+    _captcha_executor = ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+    )
+
+@app.on_event("shutdown")
+async def stop_captcha_executor():
+    global _captcha_executor
+    _captcha_executor.shutdown(wait=False, cancel_futures=True)
+    _captcha_executor = None
+
+@app.on_event("shutdown")
+async def stop_booking_writer():
+    await booking_writer.stop()
+
+@app.on_event("shutdown")
+async def stop_broadcast_flusher():
+    await manager.stop()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await app_state.client.close()
\ No newline at end of file
@@ -20,45 +20,78 @@ const App = () => {
   // WebSocket setup
   useEffect(() => {
     const wsUrl = BACKEND_URL.replace('https://', 'wss://').replace('http://', 'ws://') + '/ws';
+    let reconnectTimer = null;
+    let unmounted = false;
+    let hasConnected = false;
     
-    try {
-      ws = new WebSocket(wsUrl);
-      
-      ws.onopen = () => {
-        console.log('WebSocket connected');
-      };
-      
-      ws.onmessage = (event) => {
-        try {
-          const data = JSON.parse(event.data);
-          
-          if (data.type === 'applicant_created' || data.type === 'applicant_updated') {
+    // The server closes clients it could not deliver a broadcast to, so reconnect
+    // after any close and refetch whatever may have been missed meanwhile
+    const scheduleReconnect = () => {
+      if (!unmounted) {
+        reconnectTimer = setTimeout(connect, 3000);
+      }
+    };
+    
+    const connect = () => {
+      try {
+        ws = new WebSocket(wsUrl);
+        ws.binaryType = 'arraybuffer';
+        
+        ws.onopen = () => {
+          console.log('WebSocket connected');
+          if (hasConnected) {
             fetchApplicants();
-          } else if (data.type === 'credential_created' || data.type === 'credential_updated') {
             fetchCredentials();
-          } else if (data.type === 'system_status' || data.type === 'system_started' || data.type === 'system_stopped') {
-            setSystemStatus(data.data);
-          } else if (data.type === 'booking_completed') {
+            fetchSystemStatus();
             fetchBookings();
-            showMessage('Booking completed successfully!', 'success');
           }
-        } catch (error) {
-          console.log('WebSocket message received:', event.data);
-        }
-      };
-      
-      ws.onerror = (error) => {
-        console.error('WebSocket error:', error);
-      };
-      
-      ws.onclose = () => {
-        console.log('WebSocket disconnected');
-      };
-    } catch (error) {
-      console.error('WebSocket connection failed:', error);
-    }
+          hasConnected = true;
+        };
+        
+        ws.onmessage = (event) => {
+          try {
+            // Broadcasts arrive as binary frames holding a batch (JSON array) of messages
+            const text = typeof event.data === 'string' ? event.data : new TextDecoder().decode(event.data);
+            const batch = JSON.parse(text);
+            
+            for (const data of Array.isArray(batch) ? batch : [batch]) {
+              if (data.type === 'applicant_created' || data.type === 'applicant_updated') {
+                fetchApplicants();
+              } else if (data.type === 'credential_created' || data.type === 'credential_updated') {
+                fetchCredentials();
+              } else if (data.type === 'system_status' || data.type === 'system_started' || data.type === 'system_stopped') {
+                setSystemStatus(data.data);
+              } else if (data.type === 'booking_completed') {
+                fetchBookings();
+                showMessage('Booking completed successfully!', 'success');
+              } else if (data.type === 'booking_failed') {
+                showMessage('Booking could not be saved. Please try again.', 'error');
+              }
+            }
+          } catch (error) {
+            console.log('WebSocket message received:', event.data);
+          }
+        };
+        
+        ws.onerror = (error) => {
+          console.error('WebSocket error:', error);
+        };
+        
+        ws.onclose = () => {
+          console.log('WebSocket disconnected');
+          scheduleReconnect();
+        };
+      } catch (error) {
+        console.error('WebSocket connection failed:', error);
+        scheduleReconnect();
+      }
+    };
+    
+    connect();
     
     return () => {
+      unmounted = true;
+      clearTimeout(reconnectTimer);
       if (ws) {
         ws.close();
       }
@@ -82,7 +115,7 @@ const App = () => {
   const fetchApplicants = async () => {
     try {
       const response = await axios.get(`${API}/applicants`);
-      setApplicants(response.data);
+      setApplicants(response.data.items);
     } catch (error) {
       console.error('Error fetching applicants:', error);
       showMessage('Error fetching applicants', 'error');
@@ -92,7 +125,7 @@ const App = () => {
   const fetchCredentials = async () => {
     try {
       const response = await axios.get(`${API}/credentials`);
-      setCredentials(response.data);
+      setCredentials(response.data.items);
     } catch (error) {
       console.error('Error fetching credentials:', error);
       showMessage('Error fetching credentials', 'error');
@@ -111,7 +144,7 @@ const App = () => {
   const fetchBookings = async () => {
     try {
       const response = await axios.get(`${API}/bls/bookings`);
-      setBookings(response.data);
+      setBookings(response.data.items);
     } catch (error) {
       console.error('Error fetching bookings:', error);
     }
@@ -0,0 +1,78 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+# Minimal in-memory stand-in for a Mongojet collection, covering the query
+# shapes server.py issues: equality, $lt, $or, multi-key sort and projections
+def _matches(document, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not document[key] < condition["$lt"]:
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+def _project(document, projection):
+    included = {field for field, flag in (projection or {}).items() if flag and field != "_id"}
+    excluded = {field for field, flag in (projection or {}).items() if not flag}
+    return {
+        field: value for field, value in document.items()
+        if field not in excluded and (not included or field in included)
+    }
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self.insert_many_calls = []
+
+    async def find_many(self, query=None, sort=None, limit=0, projection=None):
+        documents = [document for document in self.documents if _matches(document, query or {})]
+        for field, direction in reversed(list((sort or {}).items())):
+            documents.sort(key=lambda document: document[field], reverse=direction < 0)
+        if limit:
+            documents = documents[:limit]
+        return [_project(document, projection) for document in documents]
+
+    async def insert_one(self, document):
+        self.documents.append(document)
+        return {"inserted_id": None}
+
+    async def insert_many(self, documents, ordered=True):
+        self.insert_many_calls.append(documents)
+        self.documents.extend(documents)
+        return {"inserted_ids": [None] * len(documents)}
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getattr__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    __getitem__ = __getattr__
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server.app_state, "db", database)
+    return database
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    sent = []
+    monkeypatch.setattr(server.manager, "broadcast", sent.append)
+    return sent
@@ -0,0 +1,34 @@
+import asyncio
+
+import server
+
+
+def test_booking_writer_flushes_queued_records_on_stop(db, broadcasts):
+    writer = server.BookingWriter()
+    records = [{"id": str(index)} for index in range(3)]
+
+    async def run():
+        writer.start()
+        for booking_record in records:
+            await writer.put(booking_record)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert db.bookings.insert_many_calls == [records]
+    assert broadcasts == [{"type": "booking_completed", "data": record} for record in records]
+
+def test_booking_writer_reports_records_it_could_not_store(db, broadcasts):
+    async def fail_batch(documents, ordered=True):
+        raise RuntimeError("write failed")
+
+    async def fail_second(document):
+        if document["id"] == "2":
+            raise RuntimeError("write failed")
+
+    db.bookings.insert_many = fail_batch
+    db.bookings.insert_one = fail_second
+    asyncio.run(server.BookingWriter()._write([{"id": "1"}, {"id": "2"}]))
+    assert [(message["type"], message["data"]["id"]) for message in broadcasts] == [
+        ("booking_completed", "1"),
+        ("booking_failed", "2"),
+    ]
@@ -0,0 +1,49 @@
+import asyncio
+
+import orjson
+
+import server
+
+
+class FakeWebSocket:
+    def __init__(self, stalled=False):
+        self.frames = []
+        self.stalled = stalled
+        self.close_code = None
+
+    async def send_bytes(self, data):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.frames.append(orjson.loads(data))
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def test_flusher_survives_a_batch_that_cannot_be_encoded():
+    manager = server.ConnectionManager()
+    websocket = FakeWebSocket()
+
+    async def run():
+        manager.start()
+        manager.active_connections.add(websocket)
+        manager.broadcast({"type": "bad", "data": object()})
+        await asyncio.sleep(0.01)
+        manager.broadcast({"type": "good"})
+        await asyncio.sleep(0.01)
+        await manager.stop()
+
+    asyncio.run(run())
+    assert websocket.frames == [[{"type": "good"}]]
+
+
+def test_stalled_client_is_dropped_and_closed():
+    manager = server.ConnectionManager()
+    manager.SEND_TIMEOUT = 0.01
+    healthy, stalled = FakeWebSocket(), FakeWebSocket(stalled=True)
+    manager.active_connections.update((healthy, stalled))
+
+    asyncio.run(manager._send_all(orjson.dumps([{"type": "ping"}])))
+    assert manager.active_connections == {healthy}
+    assert healthy.frames == [[{"type": "ping"}]] and healthy.close_code is None
+    assert stalled.close_code == 1011
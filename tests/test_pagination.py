@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote_plus
+
+import orjson
+import pytest
+
+import server
+
+
+def _created_at(index):
+    # Pairs of documents share a timestamp so page boundaries fall on ties
+    return datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=index // 2)
+
+def _read_all_pages(handler, limit=2):
+    items, cursors, after = [], [], None
+    while True:
+        page = orjson.loads(asyncio.run(handler(after=after, limit=limit)).body)
+        items.extend(page["items"])
+        if page["next"] is None:
+            return items, cursors
+        after = page["next"]
+        cursors.append(after)
+
+def _assert_round_trip(items, cursors, documents):
+    expected = sorted(documents, key=lambda document: (document["created_at"], document["id"]), reverse=True)
+    assert [item["id"] for item in items] == [document["id"] for document in expected]
+    # Cursors survive being appended to a URL unencoded
+    assert cursors and all(unquote_plus(cursor) == cursor for cursor in cursors)
+
+@pytest.mark.parametrize("collection, handler", [
+    ("applicants", server.get_applicants),
+    ("credentials", server.get_credentials),
+])
+def test_cursor_round_trip_over_datetime_created_at(db, collection, handler):
+    documents = [{"id": f"{index:02d}", "created_at": _created_at(index)} for index in range(7)]
+    db[collection].documents.extend(documents)
+    items, cursors = _read_all_pages(handler)
+    _assert_round_trip(items, cursors, documents)
+
+def test_cursor_round_trip_over_booking_string_created_at(db):
+    documents = [
+        {"id": f"{index:02d}", "created_at": _created_at(index).isoformat(), "booking_request": {}}
+        for index in range(7)
+    ]
+    db.bookings.documents.extend(documents)
+    items, cursors = _read_all_pages(server.get_bookings)
+    _assert_round_trip(items, cursors, documents)
+    assert all("booking_request" not in item for item in items)
+
+def test_cursor_round_trip_over_legacy_naive_booking_created_at(db):
+    # Older bookings stored datetime.utcnow().isoformat(), with no UTC offset
+    documents = [
+        {"id": f"{index:02d}", "created_at": _created_at(index).replace(tzinfo=None).isoformat()}
+        for index in range(7)
+    ]
+    db.bookings.documents.extend(documents)
+    for limit in (1, 2, 3):
+        items, cursors = _read_all_pages(server.get_bookings, limit=limit)
+        _assert_round_trip(items, cursors, documents)
+
+def test_cursor_round_trip_over_mixed_booking_created_at_forms(db):
+    documents = [
+        {"id": f"{index:02d}", "created_at": _created_at(index).replace(tzinfo=None).isoformat()}
+        for index in range(4)
+    ] + [
+        {"id": f"{index:02d}", "created_at": _created_at(index).isoformat()}
+        for index in range(4, 8)
+    ]
+    db.bookings.documents.extend(documents)
+    items, cursors = _read_all_pages(server.get_bookings)
+    _assert_round_trip(items, cursors, documents)
+
+@pytest.mark.parametrize("after", ["not-a-cursor", "MQ", "W10", "WyJub3ciLCAiMDEiXQ"])
+def test_invalid_cursor_is_rejected(after):
+    with pytest.raises(server.HTTPException) as excinfo:
+        server._after_filter(after)
+    assert excinfo.value.status_code == 400
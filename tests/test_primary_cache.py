@@ -0,0 +1,76 @@
+import asyncio
+
+import server
+
+
+def test_primary_cache_serves_cached_document_until_invalidated():
+    cache = server.PrimaryCache()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"id": str(len(loads))}
+
+    async def run():
+        first = await cache.get("applicant", load)
+        second = await cache.get("applicant", load)
+        cache.invalidate("applicant")
+        third = await cache.get("applicant", load)
+        return first, second, third
+
+    assert asyncio.run(run()) == ({"id": "1"}, {"id": "1"}, {"id": "2"})
+    assert len(loads) == 2
+
+def test_primary_cache_expires_after_ttl():
+    now = [1000.0]
+    cache = server.PrimaryCache(clock=lambda: now[0])
+
+    async def run():
+        await cache.get("credential", lambda: asyncio.sleep(0, {"id": "old"}))
+        now[0] += cache.TTL + 1
+        return await cache.get("credential", lambda: asyncio.sleep(0, {"id": "new"}))
+
+    assert asyncio.run(run()) == {"id": "new"}
+
+def test_primary_cache_does_not_store_a_load_that_raced_an_invalidation():
+    cache = server.PrimaryCache()
+
+    async def run():
+        release = asyncio.Event()
+
+        async def stale_load():
+            await release.wait()
+            return {"id": "stale"}
+
+        pending = asyncio.create_task(cache.get("applicant", stale_load))
+        await asyncio.sleep(0)
+        # A write lands while the read is in flight
+        cache.invalidate("applicant")
+        release.set()
+        stale = await pending
+        fresh = await cache.get("applicant", lambda: asyncio.sleep(0, {"id": "fresh"}))
+        return stale, fresh
+
+    assert asyncio.run(run()) == ({"id": "stale"}, {"id": "fresh"})
+
+def test_primary_cache_loads_different_slots_concurrently():
+    cache = server.PrimaryCache()
+
+    async def run():
+        started = {"applicant": asyncio.Event(), "credential": asyncio.Event()}
+
+        def load(slot, other):
+            async def load_slot():
+                # Each load waits for the other to start, which deadlocks (and
+                # times out) if one slot's load blocks the other's
+                started[slot].set()
+                await started[other].wait()
+                return {"id": slot}
+            return load_slot
+
+        return await asyncio.wait_for(asyncio.gather(
+            cache.get("applicant", load("applicant", "credential")),
+            cache.get("credential", load("credential", "applicant"))
+        ), 1.0)
+
+    assert asyncio.run(run()) == [{"id": "applicant"}, {"id": "credential"}]
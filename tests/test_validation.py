@@ -0,0 +1,16 @@
+import pytest
+from fastapi.exceptions import RequestValidationError
+
+import server
+
+
+def test_validate_body_reports_errors_under_body():
+    with pytest.raises(RequestValidationError) as excinfo:
+        server._validate_body(server._CAPTCHA_REQUEST_ADAPTER, b'{"target_number": "123"}')
+    assert [error["loc"] for error in excinfo.value.errors()] == [("body", "captcha_images")]
+
+def test_validate_body_returns_model():
+    captcha_request = server._validate_body(
+        server._CAPTCHA_REQUEST_ADAPTER, b'{"target_number": "123", "captcha_images": ["aGk="]}'
+    )
+    assert captcha_request == server.CaptchaRequest(target_number="123", captcha_images=["aGk="])